@@ -1,3 +1,44 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Deployment, GeneratedFile, GenerationHistory, Project
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    list_display = ('name', 'project_type', 'stack', 'status', 'created_at')
+    list_filter = ('project_type', 'stack', 'status')
+    search_fields = ('name', 'description')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(GeneratedFile)
+class GeneratedFileAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'category', 'project', 'created_at')
+    list_filter = ('category',)
+    search_fields = ('filename',)
+
+    def get_queryset(self, request):
+        # __str__ reads project.name; without the join the changelist
+        # issues one extra SELECT per row.
+        return super().get_queryset(request).select_related('project')
+
+
+@admin.register(GenerationHistory)
+class GenerationHistoryAdmin(admin.ModelAdmin):
+    list_display = ('project', 'model_used', 'tokens_used', 'success', 'created_at')
+    list_filter = ('success', 'model_used')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('project')
+
+
+@admin.register(Deployment)
+class DeploymentAdmin(admin.ModelAdmin):
+    list_display = ('project', 'platform', 'status', 'deployed_at')
+    list_filter = ('platform', 'status')
+
+    def get_queryset(self, request):
+        # __str__ reads project.name, same N+1 as GeneratedFile.
+        return super().get_queryset(request).select_related('project')
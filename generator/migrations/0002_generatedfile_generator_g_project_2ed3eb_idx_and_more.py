@@ -0,0 +1,31 @@
+# Generated by Django 5.2.17 on 2026-08-28 06:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generatedfile',
+            index=models.Index(fields=['project', 'category'], name='generator_g_project_2ed3eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generationhistory',
+            index=models.Index(fields=['project', '-created_at'], name='generator_g_project_fcb2ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', '-created_at'], name='generator_p_user_id_00f06f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status'], name='generator_p_status_f60ec1_idx'),
+        ),
+    ]
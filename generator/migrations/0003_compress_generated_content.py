@@ -0,0 +1,60 @@
+import gzip
+
+from django.db import migrations, models
+
+COMPRESSION_MIN_BYTES = 1024
+
+
+def _compress(text):
+    data = text.encode()
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return data
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_existing(apps, schema_editor):
+    GeneratedFile = apps.get_model('generator', 'GeneratedFile')
+    GenerationHistory = apps.get_model('generator', 'GenerationHistory')
+
+    for model, source, target in (
+        (GeneratedFile, 'content', 'content_gz'),
+        (GenerationHistory, 'response', 'response_gz'),
+    ):
+        batch = []
+        for obj in model.objects.only('id', source).iterator(chunk_size=1000):
+            setattr(obj, target, _compress(getattr(obj, source)))
+            batch.append(obj)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, [target])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [target])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0002_generatedfile_generator_g_project_2ed3eb_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedfile',
+            name='content_gz',
+            field=models.BinaryField(default=b'', editable=False),
+        ),
+        migrations.AddField(
+            model_name='generationhistory',
+            name='response_gz',
+            field=models.BinaryField(default=b'', editable=False),
+        ),
+        migrations.RunPython(compress_existing, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='generatedfile',
+            name='content',
+        ),
+        migrations.RemoveField(
+            model_name='generationhistory',
+            name='response',
+        ),
+    ]
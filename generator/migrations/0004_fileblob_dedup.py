@@ -0,0 +1,59 @@
+import gzip
+import hashlib
+
+from django.db import migrations, models
+
+
+def _decompress(data):
+    data = bytes(data)
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return data.decode()
+
+
+def move_content_to_blobs(apps, schema_editor):
+    GeneratedFile = apps.get_model('generator', 'GeneratedFile')
+    FileBlob = apps.get_model('generator', 'FileBlob')
+
+    batch = []
+    for obj in GeneratedFile.objects.only('id', 'content_gz').iterator(chunk_size=1000):
+        text = _decompress(obj.content_gz)
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        FileBlob.objects.get_or_create(
+            sha256=digest, defaults={'content_gz': bytes(obj.content_gz)}
+        )
+        obj.content_sha256 = digest
+        batch.append(obj)
+        if len(batch) >= 1000:
+            GeneratedFile.objects.bulk_update(batch, ['content_sha256'])
+            batch = []
+    if batch:
+        GeneratedFile.objects.bulk_update(batch, ['content_sha256'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('generator', '0003_compress_generated_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('content_gz', models.BinaryField(default=b'', editable=False)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='generatedfile',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64, default=''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(move_content_to_blobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='generatedfile',
+            name='content_gz',
+        ),
+    ]
@@ -1,29 +1,81 @@
 # website_generator/models.py
+import gzip
+import hashlib
+import uuid
+from itertools import islice
+
 from django.db import models
 from django.contrib.auth.models import User
-import uuid
 
+# Payloads below this size aren't worth the gzip header overhead.
+COMPRESSION_MIN_BYTES = 1024
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def compress_text(text):
+    """Encode text for storage, gzipping anything over the size floor"""
+    data = text.encode()
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return data
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress_text(data):
+    """Inverse of compress_text; detects gzip by its magic bytes"""
+    data = bytes(data)
+    if data[:2] == _GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return data.decode()
+
+
+# Choice enums are materialized once at class creation, instead of a
+# fresh list literal every time Django introspects the model, and allow
+# enum-style comparisons (project.project_type == ProjectType.STATIC).
+class ProjectType(models.TextChoices):
+    STATIC = 'static', 'Static Website'
+    FULLSTACK = 'fullstack', 'Full-Stack Website'
 
-class Project(models.Model):
-    PROJECT_TYPES = [
-        ('static', 'Static Website'),
-        ('fullstack', 'Full-Stack Website'),
-    ]
-
-    STACK_CHOICES = [
-        ('html_css_js', 'HTML/CSS/JavaScript'),
-        ('react_node', 'React + Node.js'),
-        ('vue_express', 'Vue + Express'),
-        ('nextjs', 'Next.js Full-Stack'),
-        ('django_react', 'Django + React'),
-    ]
 
+class Stack(models.TextChoices):
+    HTML_CSS_JS = 'html_css_js', 'HTML/CSS/JavaScript'
+    REACT_NODE = 'react_node', 'React + Node.js'
+    VUE_EXPRESS = 'vue_express', 'Vue + Express'
+    NEXTJS = 'nextjs', 'Next.js Full-Stack'
+    DJANGO_REACT = 'django_react', 'Django + React'
+
+
+class FileCategory(models.TextChoices):
+    FRONTEND = 'frontend', 'Frontend'
+    BACKEND = 'backend', 'Backend'
+    DATABASE = 'database', 'Database'
+    CONFIG = 'config', 'Configuration'
+    DOCS = 'docs', 'Documentation'
+
+
+class ProjectStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    GENERATING = 'generating', 'Generating'
+    COMPLETED = 'completed', 'Completed'
+    FAILED = 'failed', 'Failed'
+
+
+class DeploymentPlatform(models.TextChoices):
+    VERCEL = 'vercel', 'Vercel'
+    NETLIFY = 'netlify', 'Netlify'
+    HEROKU = 'heroku', 'Heroku'
+    RAILWAY = 'railway', 'Railway'
+    RENDER = 'render', 'Render'
+
+
+class Project(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='projects')
+    # Nullable: the generator is usable without an account.
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='projects', null=True, blank=True)
     name = models.CharField(max_length=255)
     description = models.TextField()
-    project_type = models.CharField(max_length=20, choices=PROJECT_TYPES)
-    stack = models.CharField(max_length=50, choices=STACK_CHOICES)
+    project_type = models.CharField(max_length=20, choices=ProjectType.choices)
+    stack = models.CharField(max_length=50, choices=Stack.choices)
 
     # Features
     has_authentication = models.BooleanField(default=False)
@@ -38,12 +90,8 @@ class Project(models.Model):
     tokens_used = models.IntegerField(default=0)
 
     # Status
-    status = models.CharField(max_length=20, default='pending', choices=[
-        ('pending', 'Pending'),
-        ('generating', 'Generating'),
-        ('completed', 'Completed'),
-        ('failed', 'Failed'),
-    ])
+    status = models.CharField(max_length=20, default=ProjectStatus.PENDING,
+                              choices=ProjectStatus.choices)
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -51,26 +99,88 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Matches the "my projects, newest first" list query.
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status']),
+        ]
+
+    def list_files(self):
+        """File metadata for listings.
+
+        Skips the content blob -- a filename sidebar only needs ~100B
+        per row, not the full generated source.
+        """
+        return (self.files
+                .only('id', 'filename', 'category', 'file_path')
+                .order_by('category', 'filename'))
+
+    def iter_file_contents(self, chunk_size=100):
+        """Stream (filename, content) pairs for export.
+
+        Uses values_list().iterator() so ZIP/bulk-download paths never
+        materialize every file of the project in memory at once; blobs
+        are fetched one chunk at a time.
+        """
+        rows = (self.files
+                .values_list('filename', 'content_sha256')
+                .iterator(chunk_size=chunk_size))
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            blobs = dict(
+                FileBlob.objects
+                .filter(sha256__in={sha for _, sha in batch})
+                .values_list('sha256', 'content_gz')
+            )
+            for filename, sha in batch:
+                yield filename, decompress_text(blobs.get(sha, b""))
 
     def __str__(self):
         return f"{self.name} ({self.project_type})"
 
 
-class GeneratedFile(models.Model):
-    FILE_CATEGORIES = [
-        ('frontend', 'Frontend'),
-        ('backend', 'Backend'),
-        ('database', 'Database'),
-        ('config', 'Configuration'),
-        ('docs', 'Documentation'),
-    ]
+class FileBlob(models.Model):
+    """Content-addressed storage for generated file bodies.
 
+    Boilerplate (package.json, licenses, .gitignore) repeats verbatim
+    across projects; keying each distinct body by its SHA-256 stores it
+    once no matter how many GeneratedFile rows reference it.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    content_gz = models.BinaryField(default=b"", editable=False)
+
+    @property
+    def content(self):
+        return decompress_text(self.content_gz)
+
+    @content.setter
+    def content(self, value):
+        self.content_gz = compress_text(value)
+
+    @classmethod
+    def store(cls, text):
+        """Store text (if new) and return its sha256 key"""
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        cls.objects.get_or_create(
+            sha256=digest, defaults={'content': text}
+        )
+        return digest
+
+    def __str__(self):
+        return self.sha256[:12]
+
+
+class GeneratedFile(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='files')
     filename = models.CharField(max_length=255)
     file_path = models.CharField(max_length=500)
-    category = models.CharField(max_length=20, choices=FILE_CATEGORIES)
-    content = models.TextField()
+    category = models.CharField(max_length=20, choices=FileCategory.choices)
+    # Body lives in FileBlob, addressed by hash, so identical files are
+    # stored once. Use the `content` property.
+    content_sha256 = models.CharField(max_length=64, db_index=True, blank=True)
     language = models.CharField(max_length=50, blank=True)  # python, javascript, html, etc.
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -78,6 +188,28 @@ class GeneratedFile(models.Model):
 
     class Meta:
         ordering = ['category', 'filename']
+        indexes = [
+            models.Index(fields=['project', 'category']),
+        ]
+
+    # Per-instance cache of (sha256, text) so repeated reads don't
+    # re-query the blob table.
+    _content_cache = None
+
+    @property
+    def content(self):
+        if not self.content_sha256:
+            return ""
+        if (self._content_cache is None
+                or self._content_cache[0] != self.content_sha256):
+            blob = FileBlob.objects.get(sha256=self.content_sha256)
+            self._content_cache = (self.content_sha256, blob.content)
+        return self._content_cache[1]
+
+    @content.setter
+    def content(self, value):
+        self.content_sha256 = FileBlob.store(value)
+        self._content_cache = (self.content_sha256, value)
 
     def __str__(self):
         return f"{self.project.name}/{self.filename}"
@@ -87,7 +219,7 @@ class GenerationHistory(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='history')
     prompt = models.TextField()
-    response = models.TextField()
+    response_gz = models.BinaryField(default=b"", editable=False)
     model_used = models.CharField(max_length=100)
     tokens_used = models.IntegerField(default=0)
     success = models.BooleanField(default=True)
@@ -95,23 +227,26 @@ class GenerationHistory(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @property
+    def response(self):
+        return decompress_text(self.response_gz)
+
+    @response.setter
+    def response(self, value):
+        self.response_gz = compress_text(value)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Generation histories"
+        indexes = [
+            models.Index(fields=['project', '-created_at']),
+        ]
 
 
 class Deployment(models.Model):
-    DEPLOYMENT_PLATFORMS = [
-        ('vercel', 'Vercel'),
-        ('netlify', 'Netlify'),
-        ('heroku', 'Heroku'),
-        ('railway', 'Railway'),
-        ('render', 'Render'),
-    ]
-
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='deployments')
-    platform = models.CharField(max_length=20, choices=DEPLOYMENT_PLATFORMS)
+    platform = models.CharField(max_length=20, choices=DeploymentPlatform.choices)
     url = models.URLField(blank=True)
     status = models.CharField(max_length=20, default='pending')
     deployment_logs = models.TextField(blank=True)
@@ -0,0 +1,195 @@
+# website_generator/services/batched_openrouter.py
+import asyncio
+import hashlib
+import itertools
+import re
+
+import httpx
+from django.conf import settings
+
+# A batch closes as soon as either limit is hit.
+BATCH_WINDOW_SECONDS = 0.25
+BATCH_MAX_SIZE = 8
+
+# Cap on the combined completion budget: summing each caller's
+# max_tokens could ask for 8x8000 = 64k, beyond model output limits.
+BATCH_MAX_TOKENS = 16000
+
+RESPONSE_MARKER = "=== RESPONSE {request_id} ==="
+_RESPONSE_MARKER_RE = re.compile(r"^=== RESPONSE (\d+) ===\s*$", re.MULTILINE)
+
+BATCH_FRAMING = """You will receive several independent requests, each introduced by a line
+=== REQUEST <id> ===
+
+Answer every request separately and completely. Begin each answer with the
+exact line:
+=== RESPONSE <id> ===
+
+Do not mix content between requests."""
+
+
+class BatchedOpenRouterService:
+    """Coalesces concurrent generation requests into one LLM call.
+
+    Each caller awaits submit(); a per-group drain task collects up to
+    BATCH_MAX_SIZE pending requests (or whatever arrives within a 250ms
+    window), sends them as one numbered user message behind the shared
+    system prompt, and splits the response back out by request ID. This
+    amortizes the TLS round-trip and the system-prompt tokens across the
+    batch. Only requests with the same (model, temperature, system
+    prompt) are batched together.
+
+    Nothing routes through this behind the home view today: its
+    fullstack path collapsed into one combined call, background
+    upgrades run on per-thread event loops (futures are loop-bound,
+    so they cannot share a batch), and the SSE path streams. The
+    service is the extension point for ASGI-loop callers that do fan
+    out concurrent completions.
+    """
+
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or settings.OPENROUTER_API_KEY
+        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+        self._client = None
+        self._groups = {}  # group key -> (queue, drain task, system_prompt)
+        self._ids = itertools.count(1)
+
+    async def submit(self, system_prompt: str, user_prompt: str,
+                     model: str, temperature: float = 0.7,
+                     max_tokens: int = 8000) -> dict:
+        """Queue one request and wait for its share of the batch response"""
+        key = (
+            model,
+            temperature,
+            hashlib.blake2b(system_prompt.encode(), digest_size=8).hexdigest()
+        )
+        if key not in self._groups:
+            queue = asyncio.Queue()
+            task = asyncio.ensure_future(self._drain(key))
+            self._groups[key] = (queue, task, system_prompt)
+
+        queue = self._groups[key][0]
+        future = asyncio.get_event_loop().create_future()
+        await queue.put((next(self._ids), user_prompt, max_tokens, future))
+        return await future
+
+    async def aclose(self):
+        """Cancel drain tasks and close the HTTP client"""
+        for queue, task, system_prompt in self._groups.values():
+            task.cancel()
+        self._groups = {}
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=120)
+        return self._client
+
+    async def _drain(self, key):
+        """Collect pending requests for one group and fire batches"""
+        queue, _, system_prompt = self._groups[key]
+        model, temperature, _ = key
+        loop = asyncio.get_event_loop()
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + BATCH_WINDOW_SECONDS
+            while len(batch) < BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._run_batch(batch, system_prompt, model, temperature)
+
+    async def _run_batch(self, batch, system_prompt, model, temperature):
+        """Send one combined request and resolve each caller's future"""
+        if len(batch) == 1:
+            user_content = batch[0][1]
+            system_content = system_prompt
+        else:
+            sections = [
+                f"=== REQUEST {request_id} ===\n{user_prompt}"
+                for request_id, user_prompt, _, _ in batch
+            ]
+            user_content = "\n\n".join(sections)
+            system_content = f"{BATCH_FRAMING}\n\n{system_prompt}"
+
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_content},
+                {"role": "user", "content": user_content}
+            ],
+            "temperature": temperature,
+            "max_tokens": min(BATCH_MAX_TOKENS,
+                              sum(max_tokens for _, _, max_tokens, _ in batch))
+        }
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": settings.SITE_URL,
+            "X-Title": "Django AI Website Generator"
+        }
+
+        try:
+            response = await self._get_client().post(
+                self.api_url, headers=headers, json=payload
+            )
+            response.raise_for_status()
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+            tokens = data.get("usage", {}).get("total_tokens", 0)
+            used_model = data.get("model", model)
+        except Exception as e:
+            # Any failure must resolve the futures -- transport errors,
+            # bad statuses, but also a 200 with an unexpected shape
+            # (KeyError on 'choices'). Letting it propagate would kill
+            # the drain task and strand every pending and future
+            # submit() for this group.
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_result({
+                        "success": False,
+                        "error": str(e),
+                        "content": None
+                    })
+            return
+
+        answers = self._split_response(content) if len(batch) > 1 else {
+            batch[0][0]: content
+        }
+        per_request_tokens = tokens // len(batch)
+
+        for request_id, _, _, future in batch:
+            if future.done():
+                continue
+            answer = answers.get(request_id)
+            if answer is None:
+                future.set_result({
+                    "success": False,
+                    "error": f"No response section for request {request_id}",
+                    "content": None
+                })
+            else:
+                future.set_result({
+                    "success": True,
+                    "content": answer,
+                    "tokens_used": per_request_tokens,
+                    "model": used_model
+                })
+
+    @staticmethod
+    def _split_response(content: str) -> dict:
+        """Split a combined response into {request_id: answer}"""
+        answers = {}
+        matches = list(_RESPONSE_MARKER_RE.finditer(content))
+        for i, match in enumerate(matches):
+            start = match.end()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            answers[int(match.group(1))] = content[start:end].strip()
+        return answers
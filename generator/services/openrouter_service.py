@@ -1,19 +1,224 @@
 # website_generator/services/openrouter_service.py
+import asyncio
+import atexit
+import hashlib
 import os
-import requests
-from typing import Dict, List, Optional
+import random
+import re
+
+import httpx
+import orjson
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Final, List, Optional
 from django.conf import settings
+from django.core.cache import cache
+
+from .semantic_cache import get_semantic_cache
+
+# One pooled client for the whole process: keep-alive sockets skip the
+# TLS handshake on every call, and HTTP/2 multiplexes concurrent calls
+# over a single connection.
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    # Tight connect timeout: a hung handshake should fail fast instead
+    # of stalling the caller; the read timeout covers LLM latency.
+    timeout=httpx.Timeout(60.0, connect=5.0),
+    limits=httpx.Limits(max_keepalive_connections=32)
+)
+
+# Transient statuses worth retrying; anything else fails immediately.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 3
+
+
+def _close_client():
+    try:
+        asyncio.run(_CLIENT.aclose())
+    except RuntimeError:
+        pass
+
+
+atexit.register(_close_client)
+
+# Only cache near-deterministic calls; at higher temperatures identical
+# prompts are expected to produce different output.
+CACHEABLE_TEMPERATURE = 0.3
+CACHE_TIMEOUT = 86400  # 24 hours
+
+# Model families that honor cache_control prompt-prefix caching.
+PREFIX_CACHE_MODELS = ("anthropic/", "openai/gpt-4o")
+
+# Routing tiers: trivial requests ("change the button color") don't need
+# a frontier model -- the cheap tier is 5-20x cheaper and several times
+# faster. Callers that pass an explicit model bypass routing.
+MODEL_TIERS = MappingProxyType({
+    "trivial": "openai/gpt-4o-mini",
+    "complex": "anthropic/claude-3.5-sonnet",
+})
+
+TRIVIAL_KEYWORDS = ("color", "colour", "rename", "typo", "font", "spacing",
+                    "padding", "margin", "wording", "label", "caption")
+TRIVIAL_MAX_WORDS = 200
+
+# Start of the HTML document in streamed output. Bytes pattern so
+# streamed chunks can be scanned without decoding first, and tolerant of
+# the casing variants models sometimes emit.
+_DOCTYPE_RE = re.compile(rb"<!DOCTYPE\s+html", re.IGNORECASE)
+
+# System prompts live at module level so the token sequence sent to the
+# provider is byte-identical across calls -- even a whitespace change
+# busts the provider-side prefix cache.
+STATIC_SITE_SYSTEM_PROMPT: Final = """You are an expert web developer specializing in creating modern,
+responsive, and accessible static websites. Generate clean HTML5, CSS3, and vanilla JavaScript code.
+
+Requirements:
+- Use semantic HTML5
+- Modern CSS (Flexbox, Grid, CSS Variables)
+- Responsive design (mobile-first)
+- Accessibility best practices
+- Clean, commented code
+- Single HTML file with inline CSS and JavaScript"""
+
+STACK_PROMPTS: Final = MappingProxyType({
+    'react_node': """You are an expert full-stack developer specializing in React and Node.js.
+Generate production-ready code with:
+- React frontend (functional components, hooks)
+- Express.js backend with RESTful API
+- Proper project structure
+- Error handling and validation
+- Security best practices""",
+
+    'nextjs': """You are an expert Next.js developer.
+Generate a complete Next.js application with:
+- App Router or Pages Router (specify which)
+- API routes for backend
+- Server and client components
+- TypeScript (if applicable)
+- Proper data fetching patterns""",
+
+    'django_react': """You are an expert full-stack developer specializing in Django and React.
+Generate production-ready code with:
+- Django REST Framework backend
+- React frontend
+- Proper authentication
+- CORS configuration
+- Serializers and viewsets"""
+})
+
+FULLSTACK_FORMAT_TEMPLATE: Final = """Provide separate files with clear filename headers:
+1. Frontend code (components, pages)
+2. Backend code (server, routes, controllers)
+3. Database schema/models
+4. Configuration files (.env.example, package.json, requirements.txt)
+5. README.md with setup instructions
+
+Format each file like this:
+// filename: frontend/App.jsx
+[code here]
+
+// filename: backend/server.js
+[code here]
+
+Ensure all code is production-ready with proper error handling, validation, and security."""
+
+# {file_type} / {framework} are filled in with .format(); the rest of
+# each prompt stays byte-identical across calls.
+IMPROVE_CODE_SYSTEM_PROMPT: Final = """You are an expert code reviewer and developer.
+Improve the provided {file_type} code based on user feedback.
+Maintain the overall structure while implementing the requested changes.
+Provide the complete improved code."""
+
+CONVERT_SYSTEM_PROMPT: Final = """You are an expert full-stack developer.
+Convert the provided static website into a full-stack application.
+Maintain the design and frontend functionality while adding backend capabilities."""
+
+COMPONENT_SYSTEM_PROMPT: Final = """You are an expert {framework} developer.
+Generate a production-ready, reusable component based on the description.
+Include proper TypeScript types if applicable, and comprehensive comments."""
+
+
+@dataclass(slots=True, frozen=True)
+class LLMResult:
+    """Result of one LLM call.
+
+    Slots keep the per-call object dense (these flow through several
+    layers and sit in both caches); frozen makes instances hashable.
+    """
+    success: bool
+    content: Optional[str]
+    tokens_used: int = 0
+    model: str = ""
+    error: Optional[str] = None
 
 
 class OpenRouterService:
     def __init__(self):
         self.api_key = settings.OPENROUTER_API_KEY
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.default_model = "anthropic/claude-3.5-sonnet"  # or "openai/gpt-4"
-
-    def _make_request(self, messages: List[Dict], model: str = None,
-                      temperature: float = 0.7, max_tokens: int = 8000) -> Dict:
-        """Make request to OpenRouter API"""
+        self.default_model = MODEL_TIERS["complex"]
+
+    def _classify(self, prompt: str) -> str:
+        """Coarse complexity classifier for model routing.
+
+        Short prompts about cosmetic edits are 'trivial'; everything
+        else escalates to the strong model. Only the edit/component
+        paths route: the generate_*/convert methods pin the complex
+        tier explicitly, so a short site description mentioning e.g.
+        "warm colors" can never downgrade a full-site generation.
+        """
+        if len(prompt.split()) < TRIVIAL_MAX_WORDS:
+            lowered = prompt.lower()
+            if any(keyword in lowered for keyword in TRIVIAL_KEYWORDS):
+                return "trivial"
+        return "complex"
+
+    def _route_model(self, messages: List[Dict]) -> str:
+        """Pick a model tier from the last user message"""
+        user_text = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"),
+            ""
+        )
+        return MODEL_TIERS[self._classify(user_text)]
+
+    def _cache_key(self, messages: List[Dict], model: str,
+                   temperature: float) -> str:
+        """Stable cache key for a request payload"""
+        fingerprint = orjson.dumps(
+            {"m": model, "t": temperature, "msgs": messages},
+            option=orjson.OPT_SORT_KEYS
+        )
+        return "or:" + hashlib.blake2b(fingerprint, digest_size=16).hexdigest()
+
+    def _apply_prompt_caching(self, messages: List[Dict], model: str) -> List[Dict]:
+        """Mark system prompts for provider-side prefix caching.
+
+        The system prompts here are large and static, so models that
+        support cache_control can reuse their KV-cache for the prefix
+        instead of re-tokenizing it on every call. The dynamic user
+        prompt stays uncached at the end.
+        """
+        if not model.startswith(PREFIX_CACHE_MODELS):
+            return messages
+
+        marked = []
+        for message in messages:
+            if message["role"] == "system" and isinstance(message["content"], str):
+                message = {
+                    "role": "system",
+                    "content": [{
+                        "type": "text",
+                        "text": message["content"],
+                        "cache_control": {"type": "ephemeral"}
+                    }]
+                }
+            marked.append(message)
+        return marked
+
+    def _build_request(self, messages: List[Dict], model: str,
+                       temperature: float, max_tokens: int,
+                       stream: bool = False) -> tuple:
+        """Build (headers, payload) for a chat-completions call"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -22,43 +227,174 @@ class OpenRouterService:
         }
 
         payload = {
-            "model": model or self.default_model,
-            "messages": messages,
+            "model": model,
+            "messages": self._apply_prompt_caching(messages, model),
             "temperature": temperature,
             "max_tokens": max_tokens
         }
-
-        try:
-            response = requests.post(self.api_url, headers=headers, json=payload)
+        if stream:
+            payload["stream"] = True
+        if model.startswith(PREFIX_CACHE_MODELS):
+            # middle-out trims the middle of over-long prompts, keeping
+            # the cached prefix stable.
+            payload["transforms"] = ["middle-out"]
+
+        return headers, payload
+
+    async def _make_request(self, messages: List[Dict], model: str = None,
+                            temperature: float = 0.7,
+                            max_tokens: int = 8000) -> LLMResult:
+        """Make request to OpenRouter API"""
+        model = model or self._route_model(messages)
+
+        # Identical low-temperature prompts return the cached response
+        # instead of re-paying the full LLM latency and token cost.
+        cache_key = None
+        if temperature <= CACHEABLE_TEMPERATURE:
+            cache_key = self._cache_key(messages, model, temperature)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        headers, payload = self._build_request(messages, model, temperature, max_tokens)
+
+        last_error = None
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                # Exponential backoff with jitter so simultaneous
+                # retries don't re-stampede a rate-limited upstream.
+                await asyncio.sleep(
+                    min(10.0, 2 ** attempt * (0.5 + random.random()))
+                )
+
+            try:
+                # orjson is several times faster than stdlib json on the
+                # multi-KB payloads exchanged here; response.json() would
+                # route back through stdlib.
+                response = await _CLIENT.post(self.api_url, headers=headers,
+                                              content=orjson.dumps(payload))
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+            except httpx.HTTPStatusError as e:
+                last_error = e
+                if e.response.status_code in RETRY_STATUS_CODES:
+                    continue
+                break
+            except httpx.TransportError as e:
+                last_error = e
+                continue
+            except httpx.HTTPError as e:
+                last_error = e
+                break
+
+            result = LLMResult(
+                success=True,
+                content=data["choices"][0]["message"]["content"],
+                tokens_used=data.get("usage", {}).get("total_tokens", 0),
+                model=data.get("model", model)
+            )
+
+            # Only store successful responses so a transient failure
+            # can't poison the cache for a day.
+            if cache_key is not None:
+                cache.set(cache_key, result, timeout=CACHE_TIMEOUT)
+
+            return result
+
+        return LLMResult(success=False, content=None, error=str(last_error))
+
+    async def stream_completion(self, messages: List[Dict], model: str = None,
+                                temperature: float = 0.7, max_tokens: int = 8000):
+        """Stream completion text as it is generated.
+
+        Async generator yielding content deltas parsed from OpenRouter's
+        SSE frames, so callers can forward output to the browser as soon
+        as the model emits it instead of buffering the full completion.
+        Cache hits yield their content immediately; cacheable misses are
+        accumulated and stored once the stream completes.
+        """
+        model = model or self._route_model(messages)
+
+        cache_key = None
+        if temperature <= CACHEABLE_TEMPERATURE:
+            cache_key = self._cache_key(messages, model, temperature)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                yield cached.content
+                return
+
+        headers, payload = self._build_request(
+            messages, model, temperature, max_tokens, stream=True
+        )
+
+        chunks = []
+        async with _CLIENT.stream("POST", self.api_url, headers=headers,
+                                  content=orjson.dumps(payload)) as response:
             response.raise_for_status()
-            data = response.json()
-
-            return {
-                "success": True,
-                "content": data["choices"][0]["message"]["content"],
-                "tokens_used": data.get("usage", {}).get("total_tokens", 0),
-                "model": data.get("model", model)
-            }
-        except requests.exceptions.RequestException as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "content": None
-            }
-
-    def generate_static_website(self, description: str,
-                                preferences: Optional[Dict] = None) -> Dict:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                try:
+                    frame = orjson.loads(data)
+                except ValueError:
+                    continue
+                delta = frame["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+
+        if cache_key is not None and chunks:
+            result = LLMResult(
+                success=True,
+                content="".join(chunks),
+                tokens_used=0,  # usage is not reported on the stream
+                model=model
+            )
+            cache.set(cache_key, result, timeout=CACHE_TIMEOUT)
+
+    async def stream_html(self, messages: List[Dict], model: str = None,
+                          temperature: float = 0.7, max_tokens: int = 8000):
+        """Stream only the HTML document from a completion.
+
+        Buffers the stream until the DOCTYPE appears, then forwards
+        from that offset on -- dropping markdown fencing or prose the
+        model sometimes emits before the document, which the non-stream
+        extraction handled but a naive chunk relay would leak through.
+        """
+        buffer = bytearray()
+        found = False
+        async for delta in self.stream_completion(messages, model,
+                                                  temperature, max_tokens):
+            if found:
+                yield delta
+                continue
+            buffer.extend(delta.encode())
+            match = _DOCTYPE_RE.search(buffer)
+            if match:
+                found = True
+                yield bytes(buffer[match.start():]).decode()
+
+        # No DOCTYPE anywhere: pass the output through rather than
+        # swallowing it.
+        if not found and buffer:
+            yield bytes(buffer).decode()
+
+    async def generate_static_website(self, description: str,
+                                      preferences: Optional[Dict] = None) -> LLMResult:
         """Generate a static website"""
-        system_prompt = """You are an expert web developer specializing in creating modern, 
-responsive, and accessible static websites. Generate clean HTML5, CSS3, and vanilla JavaScript code.
+        # Near-duplicate prompts ("portfolio site for a photographer" vs
+        # "photographer portfolio website") resolve to one LLM call.
+        semantic_key = f"static|{description}|{preferences or ''}"
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            cached = semantic_cache.get(semantic_key)
+            if cached is not None:
+                return cached
 
-Requirements:
-- Use semantic HTML5
-- Modern CSS (Flexbox, Grid, CSS Variables)
-- Responsive design (mobile-first)
-- Accessibility best practices
-- Clean, commented code
-- Single HTML file with inline CSS and JavaScript"""
+        system_prompt = STATIC_SITE_SYSTEM_PROMPT
 
         user_prompt = f"""Create a static website with the following description:
 {description}
@@ -73,40 +409,25 @@ Include comments explaining key sections."""
             {"role": "user", "content": user_prompt}
         ]
 
-        return self._make_request(messages, max_tokens=12000)
+        result = await self._make_request(
+            messages, model=MODEL_TIERS["complex"], max_tokens=12000)
+        if semantic_cache is not None and result.success:
+            semantic_cache.add(semantic_key, result)
+        return result
 
-    def generate_fullstack_website(self, description: str,
-                                   features: Dict, stack: str) -> Dict:
+    async def generate_fullstack_website(self, description: str,
+                                         features: Dict, stack: str) -> LLMResult:
         """Generate a full-stack website"""
+        semantic_key = (
+            f"fullstack|{description}|{stack}|{sorted(features.items())}"
+        )
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            cached = semantic_cache.get(semantic_key)
+            if cached is not None:
+                return cached
 
-        # Stack-specific system prompts
-        stack_prompts = {
-            'react_node': """You are an expert full-stack developer specializing in React and Node.js.
-Generate production-ready code with:
-- React frontend (functional components, hooks)
-- Express.js backend with RESTful API
-- Proper project structure
-- Error handling and validation
-- Security best practices""",
-
-            'nextjs': """You are an expert Next.js developer.
-Generate a complete Next.js application with:
-- App Router or Pages Router (specify which)
-- API routes for backend
-- Server and client components
-- TypeScript (if applicable)
-- Proper data fetching patterns""",
-
-            'django_react': """You are an expert full-stack developer specializing in Django and React.
-Generate production-ready code with:
-- Django REST Framework backend
-- React frontend
-- Proper authentication
-- CORS configuration
-- Serializers and viewsets"""
-        }
-
-        system_prompt = stack_prompts.get(stack, stack_prompts['react_node'])
+        system_prompt = STACK_PROMPTS.get(stack, STACK_PROMPTS['react_node'])
 
         # Build feature requirements
         feature_list = []
@@ -132,36 +453,23 @@ Required Features:
 
 Tech Stack: {stack}
 
-Provide separate files with clear filename headers:
-1. Frontend code (components, pages)
-2. Backend code (server, routes, controllers)
-3. Database schema/models
-4. Configuration files (.env.example, package.json, requirements.txt)
-5. README.md with setup instructions
-
-Format each file like this:
-// filename: frontend/App.jsx
-[code here]
-
-// filename: backend/server.js
-[code here]
-
-Ensure all code is production-ready with proper error handling, validation, and security."""
+{FULLSTACK_FORMAT_TEMPLATE}"""
 
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
 
-        return self._make_request(messages, max_tokens=16000)
+        result = await self._make_request(
+            messages, model=MODEL_TIERS["complex"], max_tokens=16000)
+        if semantic_cache is not None and result.success:
+            semantic_cache.add(semantic_key, result)
+        return result
 
-    def improve_code(self, current_code: str, improvement_request: str,
-                     file_type: str = "general") -> Dict:
+    async def improve_code(self, current_code: str, improvement_request: str,
+                           file_type: str = "general") -> LLMResult:
         """Improve existing code based on user feedback"""
-        system_prompt = f"""You are an expert code reviewer and developer.
-Improve the provided {file_type} code based on user feedback.
-Maintain the overall structure while implementing the requested changes.
-Provide the complete improved code."""
+        system_prompt = IMPROVE_CODE_SYSTEM_PROMPT.format(file_type=file_type)
 
         user_prompt = f"""Current code:
 ```
@@ -177,14 +485,12 @@ Provide the complete improved code with explanations of what changed."""
             {"role": "user", "content": user_prompt}
         ]
 
-        return self._make_request(messages)
+        return await self._make_request(messages)
 
-    def convert_static_to_fullstack(self, static_code: str,
-                                    required_features: Dict, stack: str) -> Dict:
+    async def convert_static_to_fullstack(self, static_code: str,
+                                          required_features: Dict, stack: str) -> LLMResult:
         """Convert a static website to full-stack"""
-        system_prompt = """You are an expert full-stack developer.
-Convert the provided static website into a full-stack application.
-Maintain the design and frontend functionality while adding backend capabilities."""
+        system_prompt = CONVERT_SYSTEM_PROMPT
 
         features_desc = []
         if required_features.get('has_database'):
@@ -218,14 +524,13 @@ Provide:
             {"role": "user", "content": user_prompt}
         ]
 
-        return self._make_request(messages, max_tokens=16000)
+        return await self._make_request(
+            messages, model=MODEL_TIERS["complex"], max_tokens=16000)
 
-    def generate_component(self, component_description: str,
-                           framework: str = "react") -> Dict:
+    async def generate_component(self, component_description: str,
+                                 framework: str = "react") -> LLMResult:
         """Generate a specific component"""
-        system_prompt = f"""You are an expert {framework} developer.
-Generate a production-ready, reusable component based on the description.
-Include proper TypeScript types if applicable, and comprehensive comments."""
+        system_prompt = COMPONENT_SYSTEM_PROMPT.format(framework=framework)
 
         user_prompt = f"""Create a {framework} component:
 {component_description}
@@ -241,4 +546,4 @@ Include:
             {"role": "user", "content": user_prompt}
         ]
 
-        return self._make_request(messages)
\ No newline at end of file
+        return await self._make_request(messages)
\ No newline at end of file
@@ -0,0 +1,47 @@
+# website_generator/services/persistence.py
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import GeneratedFile, Project
+
+
+def save_generated_files(project, organized_files, batch_size=100):
+    """Persist parsed LLM output as GeneratedFile rows in bulk.
+
+    organized_files maps category -> {filename: content}, as produced by
+    the generation services. A fullstack project emits dozens of files;
+    bulk_create turns that into one multi-row INSERT per batch instead
+    of a round-trip per file. The parent Project row is locked for the
+    duration so a concurrent status update can't race the insert.
+    """
+    with transaction.atomic():
+        Project.objects.select_for_update().get(pk=project.pk)
+        files = [
+            GeneratedFile(
+                project=project,
+                filename=filename,
+                file_path=filename,
+                category=category,
+                content=content,
+            )
+            for category, files_by_name in organized_files.items()
+            for filename, content in files_by_name.items()
+        ]
+        GeneratedFile.objects.bulk_create(files, batch_size=batch_size)
+    return files
+
+
+def update_generated_files(files, batch_size=100):
+    """Bulk-update regenerated file contents.
+
+    bulk_update bypasses save(), so auto_now doesn't fire and
+    updated_at is set explicitly. Content bodies live in FileBlob;
+    only the content_sha256 reference is updated here.
+    """
+    now = timezone.now()
+    for generated_file in files:
+        generated_file.updated_at = now
+    with transaction.atomic():
+        GeneratedFile.objects.bulk_update(
+            files, ['content_sha256', 'updated_at'], batch_size=batch_size
+        )
@@ -0,0 +1,143 @@
+# website_generator/services/semantic_cache.py
+import atexit
+import pickle
+import threading
+
+from django.conf import settings
+
+try:
+    import faiss
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+
+def _namespace(text):
+    """Namespace prefix of a cache key ("static|..." -> "static")"""
+    return text.split("|", 1)[0]
+
+
+class SemanticCache:
+    """Embedding-based cache that matches paraphrased prompts.
+
+    Exact-match caching misses rephrasings like "portfolio site for a
+    photographer" vs "photographer portfolio website". This cache embeds
+    each prompt with a small sentence-transformer, keeps the vectors in a
+    FAISS inner-product index (cosine similarity over L2-normalized
+    embeddings), and returns the stored response when the nearest prior
+    prompt is above the similarity threshold.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """Process-wide singleton, created lazily"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.threshold = getattr(settings, "SEMANTIC_CACHE_THRESHOLD", 0.92)
+        self.index_path = str(getattr(
+            settings, "SEMANTIC_CACHE_PATH",
+            settings.BASE_DIR / "semantic_cache.faiss"
+        ))
+        self._lock = threading.Lock()
+        self._encoder = None  # loaded on first use, it's ~90MB
+        # One index per namespace ("static", "fullstack"): near-identical
+        # descriptions must never answer a fullstack request with a
+        # static result, so the namespaces never share a search space.
+        self._indexes = {}    # namespace -> FAISS index
+        self._responses = {}  # namespace -> [response for each row]
+        self._load()
+        atexit.register(self.save)
+
+    def _embed(self, text):
+        """Embed text as a (1, dim) L2-normalized float32 array"""
+        if self._encoder is None:
+            self._encoder = SentenceTransformer(EMBEDDING_MODEL)
+        vector = self._encoder.encode([text], convert_to_numpy=True)
+        vector = vector.astype(np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def get(self, text):
+        """Return the cached response for the closest prior prompt, or None"""
+        vector = self._embed(text)  # encoding is slow; keep it unlocked
+        namespace = _namespace(text)
+        # The lock covers search plus row lookup: a concurrent add can
+        # momentarily leave the index one row ahead of the responses
+        # list, and an unlocked read could hit that gap.
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None or index.ntotal == 0:
+                return None
+            similarities, rows = index.search(vector, 1)
+            if similarities[0][0] >= self.threshold:
+                return self._responses[namespace][rows[0][0]]
+        return None
+
+    def add(self, text, response):
+        """Store a response under the prompt's embedding"""
+        vector = self._embed(text)
+        namespace = _namespace(text)
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = self._indexes[namespace] = faiss.IndexFlatIP(
+                    EMBEDDING_DIM)
+                self._responses[namespace] = []
+            index.add(vector)
+            self._responses[namespace].append(response)
+
+    def save(self):
+        """Persist the indexes and responses to disk"""
+        with self._lock:
+            if not any(index.ntotal for index in self._indexes.values()):
+                return
+            payload = {
+                namespace: (faiss.serialize_index(index),
+                            self._responses[namespace])
+                for namespace, index in self._indexes.items()
+            }
+            with open(self.index_path, "wb") as f:
+                pickle.dump(payload, f)
+
+    def _load(self):
+        """Reload previously persisted indexes, if any.
+
+        A file in the old single-index format fails to unpickle and is
+        simply treated as empty -- it only ever held cache entries.
+        """
+        try:
+            with open(self.index_path, "rb") as f:
+                payload = pickle.load(f)
+            self._indexes = {
+                namespace: faiss.deserialize_index(blob)
+                for namespace, (blob, _) in payload.items()
+            }
+            self._responses = {
+                namespace: responses
+                for namespace, (_, responses) in payload.items()
+            }
+        except (OSError, RuntimeError, pickle.UnpicklingError,
+                EOFError, ValueError, AttributeError):
+            pass
+
+
+def get_semantic_cache():
+    """The shared SemanticCache, or None when disabled or unavailable"""
+    if not SEMANTIC_CACHE_AVAILABLE:
+        return None
+    if not getattr(settings, "SEMANTIC_CACHE_ENABLED", True):
+        return None
+    return SemanticCache.instance()
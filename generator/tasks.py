@@ -0,0 +1,49 @@
+from celery import shared_task
+
+from .models import GeneratedFile, Project, ProjectStatus
+
+
+@shared_task
+def generate_static_site(project_id, title, prompt, mode="ai"):
+    """Generate a static site in the background.
+
+    Runs the LLM call on a Celery worker instead of a web worker, so
+    HTTP concurrency is no longer bounded by the 10-30s generation
+    latency. Progress is tracked through Project.status, which the
+    frontend polls via the status endpoint.
+    """
+    from . import views  # local import: views pulls in heavy API clients
+
+    project = Project.objects.get(pk=project_id)
+    project.status = ProjectStatus.GENERATING
+    project.save(update_fields=["status"])
+
+    try:
+        if mode == "ai":
+            # The generation pipeline is async; Celery workers are
+            # sync, so drive it on a fresh loop. views._run also closes
+            # that loop's pooled httpx client on the way out.
+            result = views._run(views.generate_static_website(title, prompt))
+            if not result["success"]:
+                raise RuntimeError(result.get("error") or "Generation failed")
+            html = result["html"]
+            project.tokens_used = result.get("tokens", 0)
+            project.ai_model_used = result.get("model", "")
+        else:
+            html = views.generate_local_html(title, prompt)
+
+        GeneratedFile.objects.create(
+            project=project,
+            filename="index.html",
+            file_path="index.html",
+            category="frontend",
+            content=html,
+            language="html",
+        )
+    except Exception:
+        project.status = ProjectStatus.FAILED
+        project.save(update_fields=["status"])
+        raise
+
+    project.status = ProjectStatus.COMPLETED
+    project.save(update_fields=["status", "tokens_used", "ai_model_used"])
@@ -1,27 +1,129 @@
+import asyncio
 import datetime
+import hashlib
 import os
-import requests
-import json
+import httpx
+import orjson
 import zipfile
-from io import BytesIO
+
+try:
+    # SIMD-accelerated zlib drop-in (2-3x faster deflate/CRC32); the
+    # ZIP download path is CPU-bound on compression, so route zipfile
+    # through it when installed.
+    from zlib_ng import zlib_ng
+    zipfile.zlib = zlib_ng
+    zipfile.crc32 = zlib_ng.crc32
+except ImportError:
+    pass
+from collections import deque
+import random
 import re
+import string
 import google.generativeai as genai
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.html import escape
 from django.views.decorators.csrf import csrf_exempt
+from functools import lru_cache
 import tempfile
+import threading
+import time
+import uuid
+import weakref
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from .models import FileCategory, Project, ProjectType, Stack
 
-# Global storage for generated websites (use database in production)
-generated_websites = {}
+try:
+    from .tasks import generate_static_site
+except ImportError:  # celery isn't installed; background path disabled
+    generate_static_site = None
 
+genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 # -----------------------------
 # OpenRouter Service Functions
 # -----------------------------
-def call_openrouter_api(messages, model="anthropic/claude-3.5-sonnet", max_tokens=8000):
+# One pooled client per event loop: keep-alive skips the TCP+TLS
+# handshake on every LLM call, and async frees the worker during the
+# multi-second wait instead of parking a thread on it. The pool cannot
+# be shared process-wide because keep-alive connections are bound to
+# the loop that created them -- the ASGI loop reuses its client across
+# requests, while each asyncio.run() loop (background upgrade threads,
+# Celery tasks) gets its own, closed via _run() when the loop ends.
+_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def _client():
+    """The pooled httpx client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=120,
+            limits=httpx.Limits(max_connections=64,
+                                max_keepalive_connections=32),
+        )
+        _CLIENTS[loop] = client
+    return client
+
+
+def _run(coro):
+    """asyncio.run plus cleanup of the loop's pooled client.
+
+    For sync callers (worker threads, Celery tasks) driving the async
+    pipeline on a fresh, short-lived event loop.
+    """
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+            if client is not None:
+                await client.aclose()
+    return asyncio.run(wrapper())
+
+
+# Cached responses expire after an hour; long enough to absorb a
+# retry-the-same-prompt iteration loop, short enough not to go stale.
+_RESPONSE_CACHE_TIMEOUT = 3600
+
+# Transient OpenRouter failures worth one more try; anything else
+# (400s, auth) fails immediately.
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_MAX_ATTEMPTS = 3
+_BACKOFF_SECONDS = 0.5
+
+# Overall deadline for an SSE generation, tighter than the client's
+# 120s transport timeout: a stalled upstream shouldn't hold the
+# browser (and the backend slot) for two minutes.
+_STREAM_TIMEOUT = 90
+
+
+def _response_cache_key(messages, model, max_tokens):
+    """Stable exact-match cache key for one API request"""
+    fingerprint = orjson.dumps(
+        {"model": model, "messages": messages, "max_tokens": max_tokens},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return "or:" + hashlib.sha256(fingerprint).hexdigest()
+
+
+async def call_openrouter_api(messages, model="anthropic/claude-3.5-sonnet",
+                              max_tokens=8000, temperature=0.7):
     """Generic function to call OpenRouter API"""
+    # Only deterministic calls are safe to replay from cache; at
+    # temperature > 0 the same prompt is expected to vary.
+    cache_key = None
+    if temperature == 0:
+        cache_key = _response_cache_key(messages, model, max_tokens)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     url = "https://openrouter.ai/api/v1/chat/completions"
     headers = {
         "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
@@ -34,19 +136,43 @@ def call_openrouter_api(messages, model="anthropic/claude-3.5-sonnet", max_token
         "model": model,
         "messages": messages,
         "max_tokens": max_tokens,
-        "temperature": 0.7
+        "temperature": temperature
     }
 
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=120)
-        response.raise_for_status()
-        result = response.json()
-        return {
+        for attempt in range(_MAX_ATTEMPTS):
+            if attempt:
+                # Exponential backoff with jitter so concurrent callers
+                # don't re-hit a rate limit in lockstep.
+                await asyncio.sleep(
+                    _BACKOFF_SECONDS * (2 ** (attempt - 1))
+                    * (1 + random.random()))
+            try:
+                # orjson beats stdlib json several times over on the
+                # ~100KB payloads these prompts and completions run to.
+                response = await _client().post(url, headers=headers,
+                                                content=orjson.dumps(data))
+            except httpx.TransportError:
+                # Connection resets and read timeouts are as transient
+                # as a 503; retry them on the same backoff.
+                if attempt < _MAX_ATTEMPTS - 1:
+                    continue
+                raise
+            if (response.status_code in _RETRY_STATUS_CODES
+                    and attempt < _MAX_ATTEMPTS - 1):
+                continue
+            response.raise_for_status()
+            break
+        result = orjson.loads(response.content)
+        result = {
             "success": True,
             "content": result["choices"][0]["message"]["content"],
             "tokens": result.get("usage", {}).get("total_tokens", 0),
             "model": result.get("model", model)
         }
+        if cache_key is not None:
+            cache.set(cache_key, result, timeout=_RESPONSE_CACHE_TIMEOUT)
+        return result
     except Exception as e:
         return {
             "success": False,
@@ -55,40 +181,142 @@ def call_openrouter_api(messages, model="anthropic/claude-3.5-sonnet", max_token
         }
 
 
+async def stream_openrouter_api(messages, model="anthropic/claude-3.5-sonnet",
+                                max_tokens=8000, temperature=0.7):
+    """Yield completion text deltas from OpenRouter's SSE stream"""
+    url = "https://openrouter.ai/api/v1/chat/completions"
+    headers = {
+        "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:8000",
+        "X-Title": "Django AI Website Generator"
+    }
+    data = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "stream": True
+    }
+
+    async with _client().stream("POST", url, headers=headers,
+                                content=orjson.dumps(data)) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            payload = line[6:]
+            if payload == "[DONE]":
+                break
+            try:
+                delta = orjson.loads(payload)["choices"][0]["delta"].get("content")
+            except (KeyError, IndexError, ValueError):
+                continue  # keep-alive comments / malformed frames
+            if delta:
+                yield delta
+
+
 # -----------------------------
 # Code Parser Functions
 # -----------------------------
+try:
+    import re2 as _re2  # linear-time matching; optional
+except ImportError:
+    _re2 = None
+
+
+def _compile(pattern, flags=0):
+    """Compile through RE2 when available, falling back to re.
+
+    The lazy DOTALL patterns below can backtrack quadratically in
+    Python's re on pathological 16k-token responses; RE2 is linear.
+    RE2 doesn't accept stdlib flag ints, so flags are translated to an
+    inline (?is) group; patterns whose syntax RE2 rejects (lookarounds)
+    fall back per pattern.
+    """
+    if _re2 is not None:
+        inline = ''
+        if flags & re.IGNORECASE:
+            inline += 'i'
+        if flags & re.DOTALL:
+            inline += 's'
+        try:
+            return _re2.compile(f'(?{inline})' + pattern if inline else pattern)
+        except _re2.error:
+            pass  # unsupported syntax; stdlib re handles it
+    return re.compile(pattern, flags)
+
+
+# Compiled once at import: these run on every AI response.
+#
+# The marker pattern matches only the single header line -- fenced or
+# bare -- and the parser slices each file body out between consecutive
+# marker matches with plain str ops. No lazy DOTALL body and no
+# lookahead means RE2 can actually compile it (lookarounds are the one
+# thing RE2 rejects), and even the stdlib fallback has nothing to
+# backtrack over.
+_RE_FILENAME_MARKER = _compile(
+    r'(?:```[\w]*\n?)?(?://|#)\s*filename:\s*(.+?)\n',
+    re.IGNORECASE)
+# Last-resort recovery for oddly-cased / oddly-spaced fences that the
+# str.find fast path below doesn't cover.
+_RE_ANY_CODE_BLOCK = _compile(r'```html?\s*(.*?)```', re.DOTALL | re.IGNORECASE)
+
+
+def _find_fenced_block(content, tag='```html'):
+    """Extract a fenced block with str.find instead of the regex engine.
+
+    Plain delimiter search is an order of magnitude faster than a
+    DOTALL regex over a large response, and this runs on the common
+    path of every HTML extraction.
+    """
+    i = content.find(tag)
+    if i == -1:
+        return None
+    start = content.find('\n', i)
+    if start == -1:
+        return None
+    end = content.find('```', start)
+    if end == -1:
+        return content[start + 1:]
+    return content[start + 1:end]
+
+
 def parse_generated_code(content):
     """Parse AI-generated code into separate files"""
     files = {}
 
-    # Pattern 1: Code blocks with filename comments
-    pattern1 = r'```[\w]*\n?(?://|#)\s*filename:\s*(.+?)\n(.*?)```'
-    matches1 = re.finditer(pattern1, content, re.DOTALL | re.IGNORECASE)
-
-    for match in matches1:
-        filename = match.group(1).strip()
-        code = match.group(2).strip()
-        files[filename] = code
-
-    # Pattern 2: Filename markers without code blocks
-    pattern2 = r'(?://|#)\s*filename:\s*(.+?)\n(.*?)(?=(?://|#)\s*filename:|$)'
-    matches2 = re.finditer(pattern2, content, re.DOTALL | re.IGNORECASE)
-
-    for match in matches2:
-        filename = match.group(1).strip()
-        code = match.group(2).strip()
-        # Remove trailing code block markers
-        code = re.sub(r'```\s*$', '', code)
-        if filename not in files:
-            files[filename] = code
+    # Fast path: the static pipeline usually returns one bare HTML
+    # document. A couple of str checks beat two DOTALL regex scans of
+    # a 64KB response.
+    stripped = content.lstrip()
+    if stripped.startswith(('<!DOCTYPE', '<html')):
+        return {'index.html': stripped}
+
+    # Filename markers are literal text, so a substring test gates the
+    # regex pass: fenced blocks and bare markers, in one scan. The
+    # marker match is case-insensitive, so the gate has to be too.
+    if 'filename:' in content.lower():
+        matches = list(_RE_FILENAME_MARKER.finditer(content))
+        for i, match in enumerate(matches):
+            filename = match.group(1).strip()
+            start = match.end()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            code = content[start:end]
+            # A body runs to its closing fence or the next marker,
+            # whichever comes first.
+            fence = code.find('```')
+            if fence != -1:
+                code = code[:fence]
+            if filename not in files:
+                files[filename] = code.strip()
 
     # If no files found, treat as single HTML file
     if not files:
         # Try to extract HTML from code blocks
-        html_match = re.search(r'```html\n(.*?)```', content, re.DOTALL)
-        if html_match:
-            files['index.html'] = html_match.group(1).strip()
+        block = _find_fenced_block(content)
+        if block is not None:
+            files['index.html'] = block.strip()
         else:
             # Look for DOCTYPE
             start = content.find("<!DOCTYPE html>")
@@ -100,61 +328,110 @@ def parse_generated_code(content):
     return files
 
 
+# Category dispatch tables: hash lookups on basename, extension and
+# directory segments replace ~30 substring scans per generated file.
+_BASENAME_CAT = {
+    'server.js': 'backend', 'app.py': 'backend', 'main.py': 'backend',
+    'models.py': 'database', 'models.js': 'database',
+    'package.json': 'config', 'requirements.txt': 'config', '.env': 'config',
+}
+_EXT_CAT = {
+    'html': 'frontend', 'css': 'frontend', 'jsx': 'frontend',
+    'tsx': 'frontend', 'vue': 'frontend',
+    'sql': 'database',
+    'md': 'docs',
+}
+_DIR_CAT = {
+    'frontend': 'frontend', 'client': 'frontend',
+    'components': 'frontend', 'pages': 'frontend',
+    'backend': 'backend', 'server': 'backend', 'api': 'backend',
+    'routes': 'backend', 'controllers': 'backend',
+}
+# Loose tokens that only occur mid-name ("docker-compose.yml",
+# "001_migration.js"); scanned last and kept short.
+_SUBSTR_CAT = (
+    ('schema', 'database'), ('migration', 'database'), ('seed', 'database'),
+    ('.env', 'config'), ('config', 'config'), ('docker', 'config'),
+)
+
+
 def categorize_file(filename):
     """Categorize file by type"""
     filename_lower = filename.lower()
-
-    if any(x in filename_lower for x in
-           ['frontend/', 'client/', 'components/', 'pages/', '.html', '.css', '.jsx', '.tsx', '.vue']):
-        return 'frontend'
-    elif any(x in filename_lower for x in
-             ['backend/', 'server/', 'api/', 'routes/', 'controllers/', 'server.js', 'app.py', 'main.py']):
-        return 'backend'
-    elif any(x in filename_lower for x in ['schema', 'migration', 'seed', '.sql', 'models.py', 'models.js']):
-        return 'database'
-    elif any(x in filename_lower for x in ['.env', 'config', 'package.json', 'requirements.txt', 'docker']):
-        return 'config'
-    elif filename_lower.endswith('.md'):
-        return 'docs'
-    else:
-        return 'other'
+    parts = filename_lower.split('/')
+    basename = parts[-1]
+
+    category = _BASENAME_CAT.get(basename)
+    if category:
+        return category
+    if '.' in basename:
+        category = _EXT_CAT.get(basename.rsplit('.', 1)[-1])
+        if category:
+            return category
+    for part in parts[:-1]:
+        category = _DIR_CAT.get(part)
+        if category:
+            return category
+    for token, category in _SUBSTR_CAT:
+        if token in filename_lower:
+            return category
+    return 'other'
+
+
+@lru_cache(maxsize=1)
+def _default_bins():
+    """Category keys for the organized-files layout, computed once.
+
+    A tuple rather than a dict template: copies of a cached dict would
+    alias its inner bins, so callers build fresh dicts from the keys.
+    """
+    return tuple(FileCategory.values)
+
+
+def _organize_files(files):
+    """Group parsed files into the standard category bins"""
+    organized = {category: {} for category in _default_bins()}
+    for filename, content in files.items():
+        organized.setdefault(categorize_file(filename), {})[filename] = content
+    return organized
 
 
 # -----------------------------
 # Static Website Generation
 # -----------------------------
-def generate_local_html(title, prompt):
-    """Fallback local HTML generation"""
-    html = f"""<!DOCTYPE html>
+# Template for the local (no-LLM) fallback page. A string.Template
+# parsed once at import: substitute() is plain C-level interpolation,
+# and $-placeholders mean the inline CSS/JS braces need no doubling.
+_LOCAL_HTML_TEMPLATE = string.Template("""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
+    <title>$title</title>
     <script src="https://cdn.tailwindcss.com"></script>
     <style>
-        body {{
+        body {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
-        }}
-        .card {{
+        }
+        .card {
             backdrop-filter: blur(10px);
             background: rgba(255, 255, 255, 0.1);
             border: 1px solid rgba(255, 255, 255, 0.2);
-        }}
-        .animate-fade {{
+        }
+        .animate-fade {
             animation: fadeIn 1s ease-in;
-        }}
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(20px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
+        }
+        @keyframes fadeIn {
+            from { opacity: 0; transform: translateY(20px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
     </style>
 </head>
 <body class="font-sans text-white">
     <header class="sticky top-0 bg-white/10 backdrop-blur-lg border-b border-white/20 p-4">
         <nav class="container mx-auto flex justify-between items-center">
-            <h1 class="text-2xl font-bold">{title}</h1>
+            <h1 class="text-2xl font-bold">$title</h1>
             <div class="space-x-6">
                 <a href="#about" class="hover:text-blue-200 transition">About</a>
                 <a href="#features" class="hover:text-blue-200 transition">Features</a>
@@ -165,8 +442,8 @@ def generate_local_html(title, prompt):
 
     <main class="container mx-auto px-4 py-16">
         <section class="text-center mb-16 animate-fade">
-            <h2 class="text-5xl font-bold mb-6">{title}</h2>
-            <p class="text-xl text-blue-100 max-w-2xl mx-auto">{prompt}</p>
+            <h2 class="text-5xl font-bold mb-6">$title</h2>
+            <p class="text-xl text-blue-100 max-w-2xl mx-auto">$prompt</p>
             <button onclick="showAlert()" class="mt-8 bg-white text-purple-600 px-8 py-3 rounded-full font-bold hover:scale-105 transition transform">
                 Get Started
             </button>
@@ -193,7 +470,7 @@ def generate_local_html(title, prompt):
         <section id="about" class="card p-12 rounded-2xl text-center mb-16">
             <h2 class="text-3xl font-bold mb-6">About This Project</h2>
             <p class="text-lg text-blue-100 max-w-3xl mx-auto leading-relaxed">
-                This website was generated as a starting template. The prompt was: "{prompt}".
+                This website was generated as a starting template. The prompt was: "$prompt".
                 You can customize this template with your own content, colors, and functionality.
             </p>
         </section>
@@ -214,56 +491,118 @@ def generate_local_html(title, prompt):
 
     <footer class="bg-black/30 backdrop-blur-lg border-t border-white/20 mt-20 py-8">
         <div class="container mx-auto text-center">
-            <p class="text-blue-100">© {datetime.datetime.now().year} {title}. Generated with ZynoxGenI.</p>
+            <p class="text-blue-100">© $year $title. Generated with ZynoxGenI.</p>
         </div>
     </footer>
 
     <script>
-        function showAlert() {{
-            alert('Welcome to {title}! This is a demo website.');
-        }}
+        function showAlert() {
+            alert('Welcome to $title! This is a demo website.');
+        }
 
-        function handleSubmit(event) {{
+        function handleSubmit(event) {
             event.preventDefault();
             alert('Thanks for your message! This is a demo form.');
             event.target.reset();
-        }}
+        }
 
         // Smooth scrolling for navigation links
-        document.querySelectorAll('a[href^="#"]').forEach(anchor => {{
-            anchor.addEventListener('click', function (e) {{
+        document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+            anchor.addEventListener('click', function (e) {
                 e.preventDefault();
                 const target = document.querySelector(this.getAttribute('href'));
-                if (target) {{
-                    target.scrollIntoView({{ behavior: 'smooth', block: 'start' }});
-                }}
-            }});
-        }});
+                if (target) {
+                    target.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                }
+            });
+        });
 
         // Intersection Observer for animations
-        const observerOptions = {{
+        const observerOptions = {
             threshold: 0.1,
             rootMargin: '0px 0px -100px 0px'
-        }};
+        };
 
-        const observer = new IntersectionObserver((entries) => {{
-            entries.forEach(entry => {{
-                if (entry.isIntersecting) {{
+        const observer = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
                     entry.target.style.opacity = '1';
                     entry.target.style.transform = 'translateY(0)';
-                }}
-            }});
-        }}, observerOptions);
+                }
+            });
+        }, observerOptions);
 
         document.querySelectorAll('.card').forEach(el => observer.observe(el));
     </script>
 </body>
-</html>"""
-    return html
+</html>""")
 
+# The footer year changes once a year; today() still does a clock
+# syscall plus a localtime conversion, so re-derive it at most hourly
+# behind a cheap monotonic check instead of on every render.
+_YEAR = datetime.date.today().year
+_YEAR_CHECKED_AT = time.monotonic()
+_YEAR_RECHECK_SECONDS = 3600
 
-def generate_static_website(title, prompt, preferences=None):
-    """Generate a static website using OpenRouter"""
+
+def _current_year():
+    global _YEAR, _YEAR_CHECKED_AT
+    now = time.monotonic()
+    if now - _YEAR_CHECKED_AT >= _YEAR_RECHECK_SECONDS:
+        _YEAR = datetime.date.today().year
+        _YEAR_CHECKED_AT = now
+    return _YEAR
+
+
+def generate_local_html(title, prompt):
+    """Fallback local HTML generation"""
+    return _LOCAL_HTML_TEMPLATE.substitute(
+        title=escape(title), prompt=escape(prompt), year=_current_year()
+    )
+
+
+try:
+    import tiktoken
+    _TOKEN_ENCODER = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # fall back to a character estimate
+    _TOKEN_ENCODER = None
+
+
+def _truncate_to_tokens(text, max_tokens):
+    """Cut text down to a token budget.
+
+    Prompt size is billed and scheduled in tokens, so truncating by
+    tokens keeps it predictable; without tiktoken installed a
+    4-chars-per-token estimate approximates the same budget.
+    """
+    if _TOKEN_ENCODER is not None:
+        tokens = _TOKEN_ENCODER.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return _TOKEN_ENCODER.decode(tokens[:max_tokens])
+    limit = max_tokens * 4
+    return text if len(text) <= limit else text[:limit]
+
+
+def _ensure_tailwind(content, start=0):
+    """Return content from start on, injecting the Tailwind CDN if absent.
+
+    Takes an offset instead of a pre-sliced string so callers don't
+    copy a ~16k-token body once to trim it and again to patch it; the
+    single slice happens here.
+    """
+    if content.find('cdn.tailwindcss.com', start) == -1:
+        head = content.find('<head>', start)
+        if head != -1:
+            insert = head + len('<head>')
+            return (content[start:insert]
+                    + '\n  <script src="https://cdn.tailwindcss.com"></script>'
+                    + content[insert:])
+    return content[start:] if start else content
+
+
+def _static_site_messages(title, prompt, preferences=None):
+    """Build the chat messages for a static-site generation"""
     system_prompt = """You are an expert web designer specializing in creating modern, responsive websites.
 
 CRITICAL REQUIREMENTS:
@@ -305,44 +644,41 @@ CRITICAL: Generate ONE complete HTML file with:
 Do NOT create separate files. Everything must be in ONE HTML file.
 Make it visually stunning and fully functional."""
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
 
-    result = call_openrouter_api(messages, model="gpt-4o", max_tokens=16000)
+
+async def generate_static_website(title, prompt, preferences=None):
+    """Generate a static website using OpenRouter"""
+    messages = _static_site_messages(title, prompt, preferences)
+
+    # A single-file page fits comfortably in 6k tokens; asking for 16k
+    # makes the provider reserve KV-cache it will never use.
+    result = await call_openrouter_api(messages, model="gpt-4o", max_tokens=6000)
 
     if result['success']:
         content = result['content']
-        # Extract HTML - try multiple patterns
+        # Extract HTML - try multiple patterns, cheapest first
 
         # Pattern 1: Look for <!DOCTYPE html>
         start = content.find("<!DOCTYPE html>")
         if start == -1:
             # Pattern 2: Look for <html
             start = content.find("<html")
-        if start == -1:
-            # Pattern 3: Look for ```html code block
-            html_match = re.search(r'```html\s*(<!DOCTYPE html>.*?)```', content, re.DOTALL | re.IGNORECASE)
-            if html_match:
-                html_content = html_match.group(1)
-            else:
-                # Pattern 4: Just take everything in code block
-                html_match = re.search(r'```html?\s*(.*?)```', content, re.DOTALL | re.IGNORECASE)
-                if html_match:
-                    html_content = html_match.group(1)
-                else:
-                    html_content = content
+        if start != -1:
+            # Hand (content, start) to the Tailwind step rather than
+            # slicing here, so the response body is copied only once.
+            html_content = _ensure_tailwind(content, start)
         else:
-            html_content = content[start:]
-
-        # Ensure Tailwind CDN is included
-        if 'cdn.tailwindcss.com' not in html_content and '<head>' in html_content:
-            # Inject Tailwind CDN
-            html_content = html_content.replace(
-                '<head>',
-                '<head>\n  <script src="https://cdn.tailwindcss.com"></script>'
-            )
+            # Pattern 3: Look for a ```html code block
+            html_content = _find_fenced_block(content)
+            if html_content is None:
+                # Pattern 4: any code block, odd casing included
+                html_match = _RE_ANY_CODE_BLOCK.search(content)
+                html_content = html_match.group(1) if html_match else content
+            html_content = _ensure_tailwind(html_content)
 
         return {
             "success": True,
@@ -360,48 +696,45 @@ Make it visually stunning and fully functional."""
 # -----------------------------
 # Full-Stack Website Generation
 # -----------------------------
-def generate_fullstack_website(title, prompt, stack, features):
-    """Generate a full-stack website"""
-
-    # Stack-specific prompts
-    stack_configs = {
-        'react_node': {
-            'name': 'React + Node.js + Express',
-            'prompt': """Create a full-stack web application with:
+# Stack-specific prompts, shared by the fullstack and combined paths.
+_STACK_CONFIGS = {
+    'react_node': {
+        'name': 'React + Node.js + Express',
+        'prompt': """Create a full-stack web application with:
 - Frontend: React with functional components and hooks
 - Backend: Express.js with RESTful API
 - Use modern ES6+ JavaScript
 - Include proper error handling and validation"""
-        },
-        'nextjs': {
-            'name': 'Next.js Full-Stack',
-            'prompt': """Create a Next.js 14+ application with:
+    },
+    'nextjs': {
+        'name': 'Next.js Full-Stack',
+        'prompt': """Create a Next.js 14+ application with:
 - App Router (not Pages Router)
 - Server and Client Components
 - API Routes for backend
 - TypeScript (optional but preferred)
 - Modern React patterns"""
-        },
-        'vue_express': {
-            'name': 'Vue.js + Express',
-            'prompt': """Create a full-stack web application with:
+    },
+    'vue_express': {
+        'name': 'Vue.js + Express',
+        'prompt': """Create a full-stack web application with:
 - Frontend: Vue.js 3 with Composition API
 - Backend: Express.js with RESTful API
 - Use modern JavaScript/TypeScript"""
-        },
-        'django_react': {
-            'name': 'Django + React',
-            'prompt': """Create a full-stack web application with:
+    },
+    'django_react': {
+        'name': 'Django + React',
+        'prompt': """Create a full-stack web application with:
 - Backend: Django with Django REST Framework
 - Frontend: React with hooks
 - Proper CORS configuration
 - Token-based authentication"""
-        }
     }
+}
 
-    config = stack_configs.get(stack, stack_configs['react_node'])
 
-    # Build feature requirements
+def _feature_requirements(features):
+    """Bullet list of requested features for the fullstack prompts"""
     feature_list = []
     if features.get('has_authentication'):
         feature_list.append("- User authentication (JWT or session-based with login/register)")
@@ -413,6 +746,13 @@ def generate_fullstack_website(title, prompt, stack, features):
         feature_list.append("- Real-time updates using WebSockets")
     if features.get('has_payments'):
         feature_list.append("- Payment integration (Stripe setup)")
+    return feature_list
+
+
+async def generate_fullstack_website(title, prompt, stack, features):
+    """Generate a full-stack website"""
+    config = _STACK_CONFIGS.get(stack, _STACK_CONFIGS['react_node'])
+    feature_list = _feature_requirements(features)
 
     system_prompt = f"""You are an expert full-stack developer specializing in {config['name']}.
 
@@ -454,26 +794,89 @@ Provide complete, working code for all files needed to run this application."""
         {"role": "user", "content": user_prompt}
     ]
 
-    result = call_openrouter_api(messages, model="gpt-4o", max_tokens=16000)
+    # Scale the completion budget with the feature count; a bare CRUD
+    # app doesn't need the full 16k allocation.
+    max_tokens = min(16000, 3000 + 2000 * max(len(feature_list), 1))
+    result = await call_openrouter_api(messages, model="gpt-4o",
+                                       max_tokens=max_tokens)
 
     if result['success']:
         files = parse_generated_code(result['content'])
 
         # Organize files by category
-        organized_files = {
-            'frontend': {},
-            'backend': {},
-            'database': {},
-            'config': {},
-            'docs': {}
+        organized_files = _organize_files(files)
+
+        return {
+            "success": True,
+            "files": organized_files,
+            "tokens": result['tokens'],
+            "model": result['model']
         }
 
-        for filename, content in files.items():
-            category = categorize_file(filename)
-            organized_files[category][filename] = content
+    return {
+        "success": False,
+        "error": result.get('error', 'Failed to generate full-stack website')
+    }
+
+
+async def generate_static_and_fullstack(title, prompt, stack, features):
+    """Generate the static preview and the fullstack files in one call.
+
+    Chaining generate-static then convert-to-fullstack costs two
+    sequential 16k-token round-trips; asking for both in a single
+    response removes one full API round-trip and lets the convert
+    view reuse the files without calling the LLM again.
+    """
+    config = _STACK_CONFIGS.get(stack, _STACK_CONFIGS['react_node'])
+    feature_list = _feature_requirements(features)
+
+    system_prompt = f"""You are an expert full-stack developer specializing in {config['name']}.
+
+{config['prompt']}
+
+You must produce TWO deliverables in ONE response:
+1. A complete standalone static preview of the site as a single HTML
+   file (inline CSS/JS, Tailwind via CDN), marked:
+// filename: index.html
+[complete HTML here]
+2. The full application source, each file marked:
+// filename: frontend/App.jsx
+[code here]
+
+Include frontend, backend, database schema, configuration files and a
+README.md. Ensure production-ready code with error handling, input
+validation and security best practices."""
+
+    user_prompt = f"""Create a full-stack {config['name']} application:
+
+Project: {title}
+Description: {prompt}
+
+Required Features:
+{chr(10).join(feature_list)}
+
+First output the single-file static preview as index.html, then every
+file of the full application, all with filename markers."""
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    # Static preview (~6k) plus a feature-scaled fullstack budget.
+    max_tokens = min(16000, 6000 + 2000 * max(len(feature_list), 1))
+    result = await call_openrouter_api(messages, model="gpt-4o",
+                                       max_tokens=max_tokens)
+
+    if result['success']:
+        files = parse_generated_code(result['content'])
+        preview_html = files.pop('index.html', None)
+
+        organized_files = _organize_files(files)
 
         return {
             "success": True,
+            "html": preview_html,
             "files": organized_files,
             "tokens": result['tokens'],
             "model": result['model']
@@ -488,7 +891,7 @@ Provide complete, working code for all files needed to run this application."""
 # -----------------------------
 # Convert Static to Full-Stack
 # -----------------------------
-def convert_to_fullstack(static_html, stack, features):
+async def convert_to_fullstack(static_html, stack, features):
     """Convert static website to full-stack"""
 
     feature_desc = []
@@ -513,7 +916,7 @@ Requirements:
 
 Static HTML:
 ```html
-{static_html[:3000]}  # Truncate if too long
+{_truncate_to_tokens(static_html, 750)}
 ```
 
 Add these features:
@@ -533,16 +936,11 @@ Use filename markers for each file."""
         {"role": "user", "content": user_prompt}
     ]
 
-    result = call_openrouter_api(messages, model="gpt-4o", max_tokens=16000)
+    result = await call_openrouter_api(messages, model="gpt-4o", max_tokens=8000)
 
     if result['success']:
         files = parse_generated_code(result['content'])
-        organized_files = {}
-        for filename, content in files.items():
-            category = categorize_file(filename)
-            if category not in organized_files:
-                organized_files[category] = {}
-            organized_files[category][filename] = content
+        organized_files = _organize_files(files)
 
         return {
             "success": True,
@@ -556,14 +954,99 @@ Use filename markers for each file."""
 # -----------------------------
 # Django Views
 # -----------------------------
-latest_html = None
-latest_project = None
+# Generated output lives in the Django cache keyed by ids held in the
+# user's session, not in module globals: globals aren't safe under
+# concurrent users (everyone shared one "latest" site), leak for the
+# process lifetime, and break multi-worker deployment.
+_UPGRADE_CACHE_TIMEOUT = 3600
+_PROJECT_CACHE_TIMEOUT = 3600
 
 
-def home(request):
-    """Main page - generate websites"""
-    global latest_html, latest_project
+def _store_html(request, html):
+    """Store this session's generated HTML, returning its id.
+
+    Every generation gets a fresh id: a background upgrade still
+    running for an earlier prompt then writes to the old, orphaned key
+    instead of overwriting whatever the user generated next. Stale
+    entries just age out of the cache.
+    """
+    html_id = uuid.uuid4().hex
+    request.session['html_id'] = html_id
+    cache.set(f"html:{html_id}", html, timeout=_PROJECT_CACHE_TIMEOUT)
+    return html_id
+
+
+def _get_html(request):
+    """This session's generated HTML, or None"""
+    html_id = request.session.get('html_id')
+    if not html_id:
+        return None
+    return cache.get(f"html:{html_id}")
+
+
+def _store_project(request, project):
+    """Store a generated project, remembering it in the session"""
+    cache.set(f"proj:{project['id']}", project,
+              timeout=_PROJECT_CACHE_TIMEOUT)
+    request.session['project_id'] = project['id']
+
+
+def _get_project(project_id):
+    return cache.get(f"proj:{project_id}") if project_id else None
+
+
+# Session loads hit the database, which is forbidden directly from
+# async views; the async paths go through these wrappers.
+_astore_html = sync_to_async(_store_html)
+_aget_html = sync_to_async(_get_html)
+_astore_project = sync_to_async(_store_project)
+
+
+def _run_upgrade(upgrade_key, html_key, title, prompt):
+    """Worker-thread body for a background LLM upgrade"""
+    try:
+        result = _run(generate_static_website(title, prompt))
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
 
+    if result.get('success'):
+        cache.set(html_key, result['html'], timeout=_PROJECT_CACHE_TIMEOUT)
+        cache.set(upgrade_key, {"status": "ready", "html": result['html']},
+                  timeout=_UPGRADE_CACHE_TIMEOUT)
+    else:
+        cache.set(upgrade_key,
+                  {"status": "failed", "error": result.get('error')},
+                  timeout=_UPGRADE_CACHE_TIMEOUT)
+
+
+def _start_upgrade(title, prompt, html_id):
+    """Kick off an LLM upgrade of the local template in a thread.
+
+    A thread (not asyncio.create_task) because the request's event
+    loop is torn down when the response is sent; the upgrade has to
+    outlive it. Progress lands in the cache under the returned id,
+    and the upgraded page replaces the session's html entry.
+    """
+    upgrade_id = uuid.uuid4().hex
+    key = f"upgrade:{upgrade_id}"
+    cache.set(key, {"status": "pending"}, timeout=_UPGRADE_CACHE_TIMEOUT)
+    threading.Thread(
+        target=_run_upgrade, args=(key, f"html:{html_id}", title, prompt),
+        daemon=True
+    ).start()
+    return upgrade_id
+
+
+def upgrade_status(request, upgrade_id):
+    """Poll the state of a background LLM upgrade"""
+    state = cache.get(f"upgrade:{upgrade_id}")
+    if state is None:
+        return JsonResponse({"error": "Unknown upgrade id"}, status=404)
+    return JsonResponse(state)
+
+
+async def home(request):
+    """Main page - generate websites"""
     context = {
         'generated_html': None,
         'project_data': None,
@@ -578,20 +1061,17 @@ def home(request):
 
         try:
             if project_type == "static":
-                # Generate static website
+                # Generate static website. The local template renders
+                # instantly; in AI mode the LLM upgrade runs in the
+                # background and the page polls /upgrade-status/ to
+                # hot-swap it in, so perceived time-to-preview is ~0
+                # instead of the full completion latency.
+                generated_html = generate_local_html(title, prompt)
+                html_id = await _astore_html(request, generated_html)
+                context['generated_html'] = generated_html
                 if mode == "ai":
-                    result = generate_static_website(title, prompt)
-                    if result['success']:
-                        generated_html = result['html']
-                        latest_html = generated_html
-                        context['generated_html'] = generated_html
-                        context['tokens_used'] = result['tokens']
-                    else:
-                        context['error'] = result.get('error')
-                else:
-                    generated_html = generate_local_html(title, prompt)
-                    latest_html = generated_html
-                    context['generated_html'] = generated_html
+                    context['upgrade_id'] = _start_upgrade(
+                        title, prompt, html_id)
 
             elif project_type == "fullstack":
                 # Generate full-stack website
@@ -604,13 +1084,19 @@ def home(request):
                     'has_payments': request.POST.get("has_payments") == "on",
                 }
 
-                result = generate_fullstack_website(title, prompt, stack, features)
+                # One combined call returns both the static preview and
+                # the fullstack file set, instead of two 16k-token
+                # round-trips.
+                result = await generate_static_and_fullstack(
+                    title, prompt, stack, features)
+
+                if result.get('html'):
+                    await _astore_html(request, result['html'])
+                    context['generated_html'] = result['html']
 
                 if result['success']:
-                    # Store in global dict (use database in production)
-                    project_id = f"project_{len(generated_websites) + 1}"
-                    latest_project = {
-                        'id': project_id,
+                    project = {
+                        'id': uuid.uuid4().hex,
                         'title': title,
                         'description': prompt,
                         'type': 'fullstack',
@@ -619,9 +1105,9 @@ def home(request):
                         'files': result['files'],
                         'tokens': result['tokens']
                     }
-                    generated_websites[project_id] = latest_project
+                    await _astore_project(request, project)
 
-                    context['project_data'] = latest_project
+                    context['project_data'] = project
                     context['success'] = True
                 else:
                     context['error'] = result.get('error')
@@ -632,27 +1118,91 @@ def home(request):
     return render(request, "generator/home.html", context)
 
 
+@csrf_exempt
+async def generate_stream(request):
+    """Stream a static-site generation to the browser over SSE.
+
+    Tokens are forwarded as they arrive, so the user sees output after
+    the first token (~1s) instead of after the whole 16k-token
+    completion. The full text is accumulated server-side so the
+    preview/parse/download paths still work once the stream ends.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST method required"}, status=400)
+
+    title = request.POST.get("title", "My Website")
+    prompt = request.POST.get("prompt", "")
+    messages = _static_site_messages(title, prompt)
+
+    # Allocate the html id before streaming starts: the session is
+    # written with the response headers, not after the body. Fresh per
+    # generation so a stale background upgrade can't overwrite it.
+    html_id = uuid.uuid4().hex
+    await request.session.aset('html_id', html_id)
+
+    async def event_stream():
+        chunks = []
+        stream = stream_openrouter_api(messages, model="gpt-4o",
+                                       max_tokens=6000)
+
+        def persist():
+            # Cache whatever arrived, even a partial document, so the
+            # preview still has something if the stream was cut short.
+            content = "".join(chunks)
+            if content:
+                files = parse_generated_code(content)
+                cache.set(f"html:{html_id}", files.get('index.html', content),
+                          timeout=_PROJECT_CACHE_TIMEOUT)
+
+        try:
+            async with asyncio.timeout(_STREAM_TIMEOUT):
+                async for delta in stream:
+                    chunks.append(delta)
+                    yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+        except TimeoutError:
+            yield b"data: " + orjson.dumps(
+                {"error": f"Generation timed out after {_STREAM_TIMEOUT}s"}
+            ) + b"\n\n"
+            return
+        except Exception as e:
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+            return
+        finally:
+            # Reached on completion, timeout, and client disconnect
+            # (the ASGI handler closes/cancels this generator when the
+            # browser goes away): drop the upstream connection right
+            # away instead of letting it finish the completion, and
+            # keep the partial output.
+            await stream.aclose()
+            persist()
+        yield b"data: [DONE]\n\n"
+
+    response = StreamingHttpResponse(
+        event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
 def preview(request):
     """Preview generated static website"""
-    global latest_html
-    if not latest_html:
+    html = _get_html(request)
+    if not html:
         return HttpResponse("<p>No website generated yet.</p>")
-    return HttpResponse(latest_html)
+    return HttpResponse(html)
 
 
 @csrf_exempt
-def convert_static_to_fullstack_view(request):
+async def convert_static_to_fullstack_view(request):
     """Convert current static website to full-stack"""
-    global latest_html
-
     if request.method != "POST":
         return JsonResponse({"error": "POST method required"}, status=400)
 
-    if not latest_html:
+    static_html = await _aget_html(request)
+    if not static_html:
         return JsonResponse({"error": "No static website to convert"}, status=400)
 
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         stack = data.get('stack', 'react_node')
         features = {
             'has_authentication': data.get('has_authentication', False),
@@ -660,23 +1210,42 @@ def convert_static_to_fullstack_view(request):
             'has_api': data.get('has_api', True),
         }
 
-        result = convert_to_fullstack(latest_html, stack, features)
+        # A fullstack generation in this session already produced the
+        # files for this stack and feature set; reuse them rather than
+        # paying for a second LLM round-trip. Every requested flag has
+        # to match what was generated -- newly enabling auth, say, must
+        # not silently return the no-auth files.
+        session_project = _get_project(
+            await request.session.aget('project_id'))
+        stored_features = (session_project or {}).get('features') or {}
+        if (session_project
+                and session_project.get('stack') == stack
+                and session_project.get('files')
+                and all(stored_features.get(flag, False) == wanted
+                        for flag, wanted in features.items())):
+            result = {
+                "success": True,
+                "files": session_project['files'],
+                "tokens": 0,
+            }
+        else:
+            result = await convert_to_fullstack(static_html, stack, features)
 
         if result['success']:
-            project_id = f"project_{len(generated_websites) + 1}"
             project = {
-                'id': project_id,
+                'id': uuid.uuid4().hex,
                 'title': 'Converted Project',
                 'type': 'fullstack',
                 'stack': stack,
+                'features': features,
                 'files': result['files'],
                 'tokens': result['tokens']
             }
-            generated_websites[project_id] = project
+            await _astore_project(request, project)
 
             return JsonResponse({
                 "success": True,
-                "project_id": project_id,
+                "project_id": project['id'],
                 "files": result['files']
             })
         else:
@@ -686,24 +1255,57 @@ def convert_static_to_fullstack_view(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
-def download_project(request, project_id=None):
-    """Download project as ZIP file"""
-    global latest_html, latest_project
+class _ZipStream:
+    """Write-only sink that hands zipfile's output to a generator.
+
+    zipfile can write straight to this instead of a BytesIO, so the
+    response never holds the whole archive in memory and bytes reach
+    the client while later entries are still being compressed.
+    """
+
+    def __init__(self):
+        self._chunks = deque()
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
 
-    # Create ZIP file
-    zip_buffer = BytesIO()
+    def flush(self):
+        pass
 
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        if project_id and project_id in generated_websites:
-            # Download full-stack project
-            project = generated_websites[project_id]
+    def drain(self):
+        while self._chunks:
+            yield self._chunks.popleft()
 
-            for category, files in project['files'].items():
-                for filename, content in files.items():
-                    zip_file.writestr(filename, content)
 
-            # Add README
-            readme = f"""# {project.get('title', 'Project')}
+def download_project(request, project_id=None):
+    """Download project as ZIP file"""
+    project = _get_project(project_id)
+    static_html = _get_html(request)
+
+    if not project and not static_html:
+        return HttpResponse("No project to download", status=404)
+
+    def zip_chunks():
+        stream = _ZipStream()
+        # compresslevel=1 is several times faster than the default 6
+        # and barely larger on generated source text.
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED,
+                             compresslevel=1) as zip_file:
+            if project:
+                # Download full-stack project
+                for category, files in project['files'].items():
+                    for filename, content in files.items():
+                        zip_file.writestr(filename, content)
+                        yield from stream.drain()
+
+                # Add README
+                readme = f"""# {project.get('title', 'Project')}
 
 ## Description
 {project.get('description', 'Full-stack application')}
@@ -721,19 +1323,16 @@ See individual file comments for setup instructions.
 
 Generated with Django AI Website Generator
 """
-            zip_file.writestr('README.md', readme)
-
-        elif latest_html:
-            # Download static website
-            zip_file.writestr('index.html', latest_html)
-            zip_file.writestr('README.md', '# Static Website\n\nOpen index.html in your browser.')
-
-        else:
-            return HttpResponse("No project to download", status=404)
-
-    zip_buffer.seek(0)
-
-    response = HttpResponse(zip_buffer.read(), content_type='application/zip')
+                zip_file.writestr('README.md', readme)
+            else:
+                # Download static website
+                zip_file.writestr('index.html', static_html)
+                zip_file.writestr('README.md', '# Static Website\n\nOpen index.html in your browser.')
+            yield from stream.drain()
+        # The central directory is written on close.
+        yield from stream.drain()
+
+    response = StreamingHttpResponse(zip_chunks(), content_type='application/zip')
     filename = project_id if project_id else 'static-website'
     response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
     return response
@@ -741,10 +1340,55 @@ Generated with Django AI Website Generator
 
 def view_project_files(request, project_id):
     """View generated files for a full-stack project"""
-    if project_id not in generated_websites:
+    project = _get_project(project_id)
+    if project is None:
         return HttpResponse("Project not found", status=404)
 
-    project = generated_websites[project_id]
     return render(request, "generator/project_files.html", {"project": project})
 
 
+
+# -----------------------------
+# Background Generation
+# -----------------------------
+@csrf_exempt
+def generate_async(request):
+    """Dispatch generation to a background worker, return the project id"""
+    if request.method != "POST":
+        return JsonResponse({"error": "POST method required"}, status=400)
+    if generate_static_site is None:
+        return JsonResponse({"error": "Background generation unavailable"},
+                            status=503)
+
+    title = request.POST.get("title", "My Website")
+    prompt = request.POST.get("prompt", "")
+    mode = request.POST.get("mode", "ai")
+
+    project = Project.objects.create(
+        user=request.user if request.user.is_authenticated else None,
+        name=title,
+        description=prompt,
+        project_type=ProjectType.STATIC,
+        stack=Stack.HTML_CSS_JS,
+        generation_prompt=prompt,
+    )
+    generate_static_site.delay(str(project.id), title, prompt, mode)
+
+    return JsonResponse({"project_id": str(project.id),
+                         "status": project.status})
+
+
+def generation_status(request, project_id):
+    """Poll the status of a background generation"""
+    try:
+        project = Project.objects.only(
+            "id", "status", "tokens_used"
+        ).get(pk=project_id)
+    except (Project.DoesNotExist, ValidationError, ValueError):
+        return JsonResponse({"error": "Project not found"}, status=404)
+
+    return JsonResponse({
+        "project_id": str(project.id),
+        "status": project.status,
+        "tokens_used": project.tokens_used,
+    })
@@ -0,0 +1,6 @@
+try:
+    from .celery import app as celery_app
+except ImportError:  # celery is optional in development
+    celery_app = None
+else:
+    __all__ = ('celery_app',)
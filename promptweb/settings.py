@@ -74,6 +74,38 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
+# Cache
+# LocMem by default; set REDIS_URL in production so cached LLM responses
+# survive restarts and are shared across workers.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Celery
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL",
+                                   os.environ.get("REDIS_URL", ""))
+# Without a broker, tasks run inline in the web process (development).
+CELERY_TASK_ALWAYS_EAGER = not CELERY_BROKER_URL
+
+# OpenRouter
+OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", "")
+SITE_URL = os.environ.get("SITE_URL", "http://localhost:8000")
+
+# Semantic cache (requires sentence-transformers + faiss-cpu)
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE_ENABLED", "True") == "True"
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_PATH = BASE_DIR / "semantic_cache.faiss"
+
 # Static files
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
@@ -26,6 +26,10 @@ urlpatterns = [
     path('download/<str:project_id>/', views.download_project, name='download_project'),
     path('convert-to-fullstack/', views.convert_static_to_fullstack_view, name='convert_to_fullstack'),
     path('project/<str:project_id>/files/', views.view_project_files, name='project_files'),
+    path('generate/', views.generate_async, name='generate_async'),
+    path('generate/stream/', views.generate_stream, name='generate_stream'),
+    path('status/<str:project_id>/', views.generation_status, name='generation_status'),
+    path('upgrade-status/<str:upgrade_id>/', views.upgrade_status, name='upgrade_status'),
 ]
 
 